@@ -1,3 +1,4 @@
+import os
 import sys
 import datetime
 import ffmpeg_streaming
@@ -14,6 +15,13 @@ _1080p = Representation(Size(1920, 1080), Bitrate(4096 * 1024, 320 * 1024))
 _2k = Representation(Size(2560, 1440), Bitrate(6144 * 1024, 320 * 1024))
 _4k = Representation(Size(3840, 2160), Bitrate(17408 * 1024, 320 * 1024))
 
+# libx264 encodes on CPU, set RTUBE_VIDEO_CODEC=h264_nvenc to encode on an NVIDIA GPU
+VIDEO_CODECS = ("libx264", "h264", "h264_nvenc")
+VIDEO_CODEC = os.environ.get("RTUBE_VIDEO_CODEC", "libx264")
+if VIDEO_CODEC not in VIDEO_CODECS:
+    # ffmpeg_streaming does not reject unknown codecs, it would build a broken ffmpeg command
+    sys.exit(f"Unsupported RTUBE_VIDEO_CODEC [{VIDEO_CODEC}], expected one of {', '.join(VIDEO_CODECS)}")
+
 
 def monitor(ffmpeg, duration, time_, time_left, process):
     per = round(time_ / duration * 100)
@@ -26,7 +34,7 @@ def monitor(ffmpeg, duration, time_, time_left, process):
 
 def mp4_to_hls(video_path_to_load: str):
     video = ffmpeg_streaming.input(rf"rtube/static/{video_path_to_load}.mp4")
-    hls = video.hls(Formats.h264())
+    hls = video.hls(Formats.h264(video=VIDEO_CODEC))
     # hls.auto_generate_representations()
     hls.representations(_144p, _360p)
     # logger.info("Encoding will start now.")
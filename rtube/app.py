@@ -1,10 +1,31 @@
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
-from flask import render_template, Flask
+from flask import make_response, render_template, request, send_from_directory, Flask
 from flask_s3 import FlaskS3, logger
+from werkzeug.http import generate_etag
 
 
-app = Flask(__name__)
+# mp4_to_hls.py regenerates playlists and segments under the same names, keep both short-lived
+HLS_MAX_AGE = 60
+
+
+class RTube(Flask):
+    def get_send_file_max_age(self, filename):
+        if filename and filename.startswith("videos/") and filename.endswith((".ts", ".m3u8")):
+            return HLS_MAX_AGE
+        return super().get_send_file_max_age(filename)
+
+    def send_static_file(self, filename):
+        if not self.has_static_folder:
+            raise RuntimeError("'static_folder' must be set to serve static_files.")
+        # Flask 2.0 static files carry no ETag, ask Werkzeug for its mtime and size based one
+        return send_from_directory(
+            self.static_folder, filename, max_age=self.get_send_file_max_age(filename), etag=True
+        )
+
+
+app = RTube(__name__)
 
 # You can use S3 credentials to fetch directly videos
 # app.config['FLASKS3_BUCKET_NAME'] = os.environ.get("FLASKS3_BUCKET_NAME")
@@ -14,6 +35,35 @@ app = Flask(__name__)
 # app.config['AWS_SECRET_ACCESS_KEY'] = os.environ.get("AWS_SECRET_ACCESS_KEY")
 # s3 = FlaskS3(app)
 
+MARKERS = {
+    "Gameplay": [
+        {"time": 10, "text": "Gameplay chapter 1", "overlayText": "Chapter 1"},
+        {"time": 20, "text": "Gameplay chapter 2", "overlayText": "Chapter 2"},
+        {"time": 30, "text": "Gameplay chapter 3", "overlayText": "Chapter 3"},
+    ],
+    "Gameplay_2": [
+        {"time": 5, "text": "Gameplay 2 chapter 1", "overlayText": "Chapter 1"},
+        {"time": 10, "text": "Gameplay 2 chapter 2", "overlayText": "Chapter 2"},
+        {"time": 15, "text": "Gameplay 2 chapter 3", "overlayText": "Chapter 3"},
+    ],
+}
+
+
+def render_video_page(filename):
+    page = render_template(
+        'index.html',
+        filename=filename,
+        video_path_to_load=f"videos/{filename}.m3u8",
+        markers=MARKERS.get(filename),
+    )
+    return page, generate_etag(page.encode())
+
+
+@lru_cache(maxsize=128)
+def cached_video_page(filename, script_root):
+    # script_root only keys the cache, url_for in the template reads it from the current request
+    return render_video_page(filename)
+
 
 @app.route('/')
 def hello():
@@ -22,27 +72,18 @@ def hello():
 
 @app.route('/<string:filename>')
 def distribute_video(filename):
-    markers = {
-        "Gameplay": [
-            {"time": 10, "text": "Gameplay chapter 1", "overlayText": "Chapter 1"},
-            {"time": 20, "text": "Gameplay chapter 2", "overlayText": "Chapter 2"},
-            {"time": 30, "text": "Gameplay chapter 3", "overlayText": "Chapter 3"},
-        ],
-        "Gameplay_2": [
-            {"time": 5, "text": "Gameplay 2 chapter 1", "overlayText": "Chapter 1"},
-            {"time": 10, "text": "Gameplay 2 chapter 2", "overlayText": "Chapter 2"},
-            {"time": 15, "text": "Gameplay 2 chapter 3", "overlayText": "Chapter 3"},
-        ],
-    }
-
-    video_path_to_load = f"videos/{filename}.m3u8"
-    logger.info(f"Looking for [{video_path_to_load}]")
-    return render_template(
-        'index.html',
-        filename=filename,
-        video_path_to_load=video_path_to_load,
-        markers=markers.get(filename),
-    )
+    logger.info("Looking for [videos/%s.m3u8]", filename)
+    if app.debug:
+        # Keep Jinja template auto-reload working while developing
+        page, etag = render_video_page(filename)
+    else:
+        page, etag = cached_video_page(filename, request.script_root)
+    response = make_response(page)
+    # Page only changes when markers or template change, let clients revalidate with If-None-Match
+    response.cache_control.public = True
+    response.cache_control.max_age = 60
+    response.set_etag(etag)
+    return response.make_conditional(request)
 
 
 if __name__ == '__main__':